@@ -2,14 +2,13 @@
 Webhook endpoints for receiving WhatsApp messages and status updates.
 """
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from typing import Dict, Any
 import logging
+import orjson
 
-from app.database import get_db
 from app.services.whatsapp_service import whatsapp_service
-from app.services.message_service import MessageService
-from app.schemas.message import WebhookMessageData, WebhookStatusData
+from app.services.message_service import MessageService, get_message_service
 from app.core.logging import get_logger, log_performance
 
 logger = get_logger(__name__)
@@ -28,69 +27,60 @@ async def verify_webhook(
     Verify WhatsApp webhook subscription with Meta.
     This endpoint is called by Meta to verify the webhook URL.
     """
-    logger.info(f"Webhook verification request received")
-    logger.debug(f"Mode: {hub_mode}, Challenge: {hub_challenge}, Token: {hub_verify_token[:10]}...")
+    logger.info("Webhook verification request received")
+    logger.debug("Mode: %s, Challenge: %s, Token: %s...", hub_mode, hub_challenge, hub_verify_token[:10])
     
-    try:
-        challenge = whatsapp_service.verify_webhook(
-            mode=hub_mode,
-            token=hub_verify_token,
-            challenge=hub_challenge
-        )
-        
-        if challenge:
-            logger.info("Webhook verification successful")
-            return int(challenge)
-        else:
-            logger.warning("Webhook verification failed")
-            raise HTTPException(status_code=403, detail="Verification failed")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Webhook verification error: {str(e)}")
-        logger.exception("Full error traceback:")
-        raise HTTPException(status_code=500, detail=str(e))
+    challenge = whatsapp_service.verify_webhook(
+        mode=hub_mode,
+        token=hub_verify_token,
+        challenge=hub_challenge
+    )
+    
+    if challenge:
+        logger.info("Webhook verification successful")
+        return int(challenge)
+    else:
+        logger.warning("Webhook verification failed")
+        raise HTTPException(status_code=403, detail="Verification failed")
 
 
 @router.post("/whatsapp")
-@log_performance()
+@log_performance(sample_rate=0.01, slow_threshold_ms=500)
 async def receive_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    message_service: MessageService = Depends(get_message_service)
 ):
     """
     Receive WhatsApp webhook data from Meta.
     This endpoint processes incoming messages and status updates.
     """
-    logger.info(f"Webhook data received from Meta")
+    logger.info("Webhook data received from Meta")
     
     try:
-        # Get raw webhook data
-        webhook_data = await request.json()
-        logger.info(f"Webhook data structure: {list(webhook_data.keys())}")
-        logger.debug(f"Full webhook data: {webhook_data}")
+        # Parse the raw body with orjson rather than Starlette's stdlib json
+        webhook_data = orjson.loads(await request.body())
+        logger.info("Webhook data structure: %s", list(webhook_data))
+        logger.debug("Full webhook data: %s", webhook_data)
         
         # Process webhook data
-        result = await _process_webhook_data(webhook_data, db)
+        result = await _process_webhook_data(webhook_data, message_service)
         
-        logger.info(f"Webhook processing completed: {result}")
+        logger.info("Webhook processing completed: %s", result)
         return {"status": "success", "processed": result}
         
     except Exception as e:
-        logger.error(f"Webhook processing error: {str(e)}")
-        logger.exception("Full error traceback:")
+        logger.error("Webhook processing error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         # Don't raise HTTPException here as Meta expects 200 response
         return {"status": "error", "error": str(e)}
 
 
-async def _process_webhook_data(webhook_data: Dict[str, Any], db: Session) -> Dict[str, Any]:
+async def _process_webhook_data(webhook_data: Dict[str, Any], message_service: MessageService) -> Dict[str, Any]:
     """
     Process webhook data and route to appropriate handlers.
     
     Args:
         webhook_data: Raw webhook data from Meta
-        db: Database session
+        message_service: Message service bound to the request's session
         
     Returns:
         Dict containing processing results
@@ -101,6 +91,7 @@ async def _process_webhook_data(webhook_data: Dict[str, Any], db: Session) -> Di
             "statuses_processed": 0,
             "errors": []
         }
+        status_updates = []
         
         # Extract entry data
         entry = webhook_data.get("entry", [])
@@ -123,57 +114,40 @@ async def _process_webhook_data(webhook_data: Dict[str, Any], db: Session) -> Di
                         
                         if processed_message["success"]:
                             # Store message in database
-                            message_service = MessageService(db)
                             db_result = await message_service.process_incoming_message(processed_message)
                             
                             if db_result["success"]:
                                 results["messages_processed"] += 1
-                                logger.info(f"Message processed successfully: {db_result['message_id']}")
+                                logger.info("Message processed successfully: %s", db_result["message_id"])
                             else:
                                 results["errors"].append(f"Database error: {db_result['error']}")
                         else:
                             results["errors"].append(f"Message processing error: {processed_message['error']}")
                             
                     except Exception as e:
-                        logger.error(f"Error processing message: {str(e)}")
+                        logger.error("Error processing message: %s", e)
                         results["errors"].append(f"Message processing error: {str(e)}")
                 
-                # Process statuses (message status updates)
-                statuses = value.get("statuses", [])
-                for status_data in statuses:
-                    try:
-                        # Process status update
-                        processed_status = await whatsapp_service.process_status_update({
-                            "entry": [entry_data],
-                            "changes": [change]
-                        })
-                        
-                        if processed_status["success"]:
-                            # Update message status in database
-                            message_service = MessageService(db)
-                            db_result = await message_service.update_message_status(
-                                whatsapp_message_id=processed_status["message_id"],
-                                status=processed_status["status"],
-                                timestamp=processed_status["timestamp"]
-                            )
-                            
-                            if db_result["success"]:
-                                results["statuses_processed"] += 1
-                                logger.info(f"Status updated successfully: {db_result['message_id']}")
-                            else:
-                                results["errors"].append(f"Database error: {db_result['error']}")
-                        else:
-                            results["errors"].append(f"Status processing error: {processed_status['error']}")
-                            
-                    except Exception as e:
-                        logger.error(f"Error processing status: {str(e)}")
-                        results["errors"].append(f"Status processing error: {str(e)}")
+                # Collect status updates, they are applied together below
+                for status_data in value.get("statuses", []):
+                    status_updates.append({
+                        "whatsapp_message_id": status_data.get("id"),
+                        "status": status_data.get("status"),
+                        "timestamp": status_data.get("timestamp")
+                    })
+        
+        # Process statuses (message status updates) in one transaction,
+        # off the event loop since the session is synchronous
+        if status_updates:
+            db_result = await run_in_threadpool(message_service.update_message_statuses, status_updates)
+            results["statuses_processed"] = db_result["updated"]
+            results["errors"].extend(f"Database error: {error}" for error in db_result["errors"])
         
-        logger.info(f"Webhook processing completed: {results}")
+        logger.info("Webhook processing completed: %s", results)
         return results
         
     except Exception as e:
-        logger.error(f"Error processing webhook data: {str(e)}")
+        logger.error("Error processing webhook data: %s", e)
         return {
             "messages_processed": 0,
             "statuses_processed": 0,
@@ -184,17 +158,17 @@ async def _process_webhook_data(webhook_data: Dict[str, Any], db: Session) -> Di
 @router.post("/whatsapp/test")
 async def test_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    message_service: MessageService = Depends(get_message_service)
 ):
     """
     Test webhook endpoint for development and debugging.
     """
     try:
-        webhook_data = await request.json()
-        logger.info(f"Test webhook received: {webhook_data}")
+        webhook_data = orjson.loads(await request.body())
+        logger.info("Test webhook received: %s", webhook_data)
         
         # Process test data
-        result = await _process_webhook_data(webhook_data, db)
+        result = await _process_webhook_data(webhook_data, message_service)
         
         return {
             "status": "test_success",
@@ -203,7 +177,7 @@ async def test_webhook(
         }
         
     except Exception as e:
-        logger.error(f"Test webhook error: {str(e)}")
+        logger.error("Test webhook error: %s", e)
         return {
             "status": "test_error",
             "error": str(e)
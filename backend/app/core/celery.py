@@ -2,6 +2,7 @@
 Celery configuration for background tasks and automation processing.
 """
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 # Create Celery instance
@@ -19,14 +20,30 @@ celery_app = Celery(
 # Celery configuration
 celery_app.conf.update(
     # Task execution
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],  # json kept for tasks queued before the switch
+    result_serializer="msgpack",
     timezone="UTC",
     enable_utc=True,
     
-    # Task routing
+    # Broker connection settings (keep Redis connections warm between beat ticks)
+    broker_pool_limit=10,
+    broker_connection_retry_on_startup=True,
+    broker_transport_options={
+        "visibility_timeout": 3600,  # 1 hour
+        "socket_keepalive": True,
+        "health_check_interval": 30,
+    },
+    result_backend_transport_options={
+        "socket_keepalive": True,
+        "health_check_interval": 30,
+    },
+    redis_socket_keepalive=True,
+    
+    # Task routing (status updates get their own queue so they never wait
+    # behind batch automation work; workers must consume every queue with -Q)
     task_routes={
+        "app.tasks.message_tasks.process_message_status_update": {"queue": "status_updates"},
         "app.tasks.automation_tasks.*": {"queue": "automation"},
         "app.tasks.message_tasks.*": {"queue": "messages"},
         "app.tasks.analytics_tasks.*": {"queue": "analytics"},
@@ -37,22 +54,46 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_reject_on_worker_lost=True,
     
+    # Idempotent message/analytics tasks ack on receipt; late acks (and
+    # redelivery on worker loss) stay on automation tasks only, where a
+    # lost run matters. Annotations match exact task names, not globs.
+    task_annotations={
+        name: {"acks_late": False}
+        for name in (
+            "app.tasks.message_tasks.process_message_status_update",
+            "app.tasks.message_tasks.retry_failed_messages",
+            "app.tasks.analytics_tasks.update_system_analytics",
+            "app.tasks.analytics_tasks.cleanup_old_logs",
+            "app.tasks.analytics_tasks.calculate_automation_performance",
+        )
+    },
+    
+    # Worker pool settings (pool type is chosen on the CLI with -P so that
+    # gevent/eventlet monkey patching happens before anything is imported)
+    worker_concurrency=settings.CELERY_WORKER_CONCURRENCY,
+    worker_max_tasks_per_child=settings.CELERY_WORKER_MAX_TASKS_PER_CHILD,
+    
     # Result backend settings
     result_expires=3600,  # 1 hour
     
-    # Beat schedule for periodic tasks
+    # Beat schedule for periodic tasks. Entries are pinned to staggered
+    # wall-clock minutes so they never fire in the same burst, and expire
+    # before the next run so a backed-up queue does not stack duplicates.
     beat_schedule={
         "check-birthday-automations": {
             "task": "app.tasks.automation_tasks.check_birthday_automations",
-            "schedule": 86400.0,  # Daily at midnight
+            "schedule": crontab(hour=0, minute=0),  # Daily at midnight
+            "options": {"expires": 3600},
         },
         "cleanup-old-logs": {
             "task": "app.tasks.analytics_tasks.cleanup_old_logs",
-            "schedule": 604800.0,  # Weekly
+            "schedule": crontab(day_of_week=0, hour=3, minute=23),  # Weekly
+            "options": {"expires": 3600},
         },
         "update-analytics": {
             "task": "app.tasks.analytics_tasks.update_system_analytics",
-            "schedule": 3600.0,  # Hourly
+            "schedule": crontab(minute=7),  # Hourly
+            "options": {"expires": 3000},
         },
     },
 )
@@ -3,9 +3,10 @@ Centralized logging configuration for the WhatsApp Automation MVP.
 """
 import logging
 import logging.config
+import random
 import sys
+import time
 from pathlib import Path
-from datetime import datetime
 from app.core.config import settings
 from functools import wraps
 import inspect
@@ -205,8 +206,8 @@ def setup_logging():
     # Get root logger
     logger = logging.getLogger("app")
     logger.info("Logging system initialized successfully")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
+    logger.info("Environment: %s", settings.ENVIRONMENT)
+    logger.info("Debug mode: %s", settings.DEBUG)
     
     return logger
 
@@ -237,74 +238,84 @@ def log_function_call(logger: logging.Logger = None):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
                 func_logger = logging.getLogger(func.__module__) if logger is None else logger
-                func_logger.debug(f"Calling {func.__name__} with args={args}, kwargs={kwargs}")
+                func_logger.debug("Calling %s with args=%s, kwargs=%s", func.__name__, args, kwargs)
                 try:
                     result = await func(*args, **kwargs)
-                    func_logger.debug(f"{func.__name__} completed successfully")
+                    func_logger.debug("%s completed successfully", func.__name__)
                     return result
                 except Exception as e:
-                    func_logger.error(f"{func.__name__} failed with error: {str(e)}")
+                    func_logger.error("%s failed with error: %s", func.__name__, e)
                     raise
             return async_wrapper
         else:
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
                 func_logger = logging.getLogger(func.__module__) if logger is None else logger
-                func_logger.debug(f"Calling {func.__name__} with args={args}, kwargs={kwargs}")
+                func_logger.debug("Calling %s with args=%s, kwargs=%s", func.__name__, args, kwargs)
                 try:
                     result = func(*args, **kwargs)
-                    func_logger.debug(f"{func.__name__} completed successfully")
+                    func_logger.debug("%s completed successfully", func.__name__)
                     return result
                 except Exception as e:
-                    func_logger.error(f"{func.__name__} failed with error: {str(e)}")
+                    func_logger.error("%s failed with error: %s", func.__name__, e)
                     raise
             return sync_wrapper
     return decorator
 
 
 # Performance logging decorator
-def log_performance(logger: logging.Logger = None):
+def log_performance(logger: logging.Logger = None, sample_rate: float = 1.0,
+                    slow_threshold_ms: float = None):
     """
     Decorator to log function execution time.
     
+    On hot paths, pass a sample_rate below 1.0 so only a fraction of
+    successful calls emit a log line. Calls slower than slow_threshold_ms
+    and failed calls are always logged.
+    
     Args:
         logger: Logger instance (optional)
+        sample_rate: Fraction of successful calls to log (0.0 - 1.0)
+        slow_threshold_ms: Always log calls slower than this (optional)
     """
+    def should_log(execution_ms: float) -> bool:
+        if slow_threshold_ms is not None and execution_ms > slow_threshold_ms:
+            return True
+        return sample_rate >= 1.0 or random.random() < sample_rate
+    
     def decorator(func):
+        func_logger = logging.getLogger(func.__module__) if logger is None else logger
+        
         if inspect.iscoroutinefunction(func):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                func_logger = logging.getLogger(func.__module__) if logger is None else logger
-                start_time = datetime.now()
-                func_logger.debug(f"Starting {func.__name__}")
+                start_time = time.perf_counter()
+                func_logger.debug("Starting %s", func.__name__)
                 try:
                     result = await func(*args, **kwargs)
-                    end_time = datetime.now()
-                    execution_time = (end_time - start_time).total_seconds()
-                    func_logger.info(f"{func.__name__} completed in {execution_time:.3f}s")
-                    return result
                 except Exception as e:
-                    end_time = datetime.now()
-                    execution_time = (end_time - start_time).total_seconds()
-                    func_logger.error(f"{func.__name__} failed after {execution_time:.3f}s with error: {str(e)}")
+                    execution_time = time.perf_counter() - start_time
+                    func_logger.error("%s failed after %.3fs with error: %s", func.__name__, execution_time, e)
                     raise
+                execution_time = time.perf_counter() - start_time
+                if should_log(execution_time * 1000):
+                    func_logger.info("%s completed in %.3fs", func.__name__, execution_time)
+                return result
             return async_wrapper
         else:
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
-                func_logger = logging.getLogger(func.__module__) if logger is None else logger
-                start_time = datetime.now()
-                func_logger.debug(f"Starting {func.__name__}")
+                start_time = time.perf_counter()
+                func_logger.debug("Starting %s", func.__name__)
                 try:
                     result = func(*args, **kwargs)
-                    end_time = datetime.now()
-                    execution_time = (end_time - start_time).total_seconds()
-                    func_logger.info(f"{func.__name__} completed in {execution_time:.3f}s")
-                    return result
                 except Exception as e:
-                    end_time = datetime.now()
-                    execution_time = (end_time - start_time).total_seconds()
-                    func_logger.error(f"{func.__name__} failed after {execution_time:.3f}s with error: {str(e)}")
+                    execution_time = time.perf_counter() - start_time
+                    func_logger.error("%s failed after %.3fs with error: %s", func.__name__, execution_time, e)
                     raise
+                execution_time = time.perf_counter() - start_time
+                if should_log(execution_time * 1000):
+                    func_logger.info("%s completed in %.3fs", func.__name__, execution_time)
+                return result
             return sync_wrapper
     return decorator
@@ -11,11 +11,14 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 # Create database engine
-logger.info(f"Creating database engine with URL: {os.getenv('DATABASE_URL', 'Not set')[:20]}...")
+logger.info("Creating database engine (DATABASE_URL set: %s)", bool(os.getenv('DATABASE_URL')))
 engine = create_engine(
     os.getenv("DATABASE_URL"),
-    pool_pre_ping=True,
-    pool_recycle=300,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=True,  # Reuse the most recent connection so idle extras age out via recycle
     echo=settings.DEBUG
 )
 
@@ -60,7 +63,7 @@ def create_tables():
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
     except Exception as e:
-        logger.error(f"Failed to create database tables: {str(e)}")
+        logger.error("Failed to create database tables: %s", e)
         raise
 
 
@@ -73,5 +76,5 @@ def drop_tables():
         Base.metadata.drop_all(bind=engine)
         logger.warning("All database tables dropped")
     except Exception as e:
-        logger.error(f"Failed to drop database tables: {str(e)}")
+        logger.error("Failed to drop database tables: %s", e)
         raise
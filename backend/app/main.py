@@ -1,28 +1,75 @@
 """
 Main FastAPI application with CORS and comprehensive error handling.
 """
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+import anyio
+import hashlib
 import logging
+import orjson
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
-from app.database import create_tables
 
-# Setup comprehensive logging
+# Setup comprehensive logging before importing modules that log at import
+# time (database engine, WhatsApp service configuration)
 setup_logging()
 logger = get_logger(__name__)
 
+from app.database import create_tables  # noqa: E402
+from app.services.whatsapp_service import whatsapp_service  # noqa: E402
+from app.api.messages import router as messages_router  # noqa: E402
+from app.api.webhooks import router as webhooks_router  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    logger.info("Starting WhatsApp Automation MVP...")
+    logger.info("Environment: %s", settings.ENVIRONMENT)
+    logger.info("Debug mode: %s", settings.DEBUG)
+    logger.info("Database URL configured: %s", bool(settings.DATABASE_URL))
+    logger.info("WhatsApp token configured: %s", bool(settings.WHATSAPP_TOKEN))
+    
+    # Sync endpoints run in AnyIO's threadpool; size it to the DB pool (see config)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_MAX_THREADS
+    
+    try:
+        # Create database tables off the event loop; this also opens the
+        # first pooled connection so the first request doesn't pay for it
+        logger.info("Creating database tables...")
+        await anyio.to_thread.run_sync(create_tables)
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.error("Failed to create database tables: %s", e)
+        raise
+    
+    logger.info("WhatsApp Automation MVP started successfully")
+    
+    yield
+    
+    logger.info("Shutting down WhatsApp Automation MVP...")
+    await whatsapp_service.aclose()
+    logger.info("Shutdown completed")
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
     description="WhatsApp Automation MVP - Comprehensive contact management and automation system",
     version="1.0.0",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Include API routers
+app.include_router(messages_router)
+app.include_router(webhooks_router)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -33,121 +80,72 @@ app.add_middleware(
 )
 
 
-@app.exception_handler(HTTPException)
-async def http_exception_handler(request: Request, exc: HTTPException):
-    """Handle HTTP exceptions with consistent error format."""
-    return JSONResponse(
-        status_code=exc.status_code,
+def _error_response(request: Request, status_code: int, message, **extra) -> ORJSONResponse:
+    """Build the consistent error payload shared by all exception handlers."""
+    return ORJSONResponse(
+        status_code=status_code,
         content={
             "error": True,
-            "message": exc.detail,
-            "status_code": exc.status_code,
-            "path": str(request.url)
+            "message": message,
+            **extra,
+            "status_code": status_code,
+            "path": request.url.path
         }
     )
 
 
 @app.exception_handler(StarletteHTTPException)
-async def starlette_exception_handler(request: Request, exc: StarletteHTTPException):
-    """Handle Starlette HTTP exceptions."""
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
-            "error": True,
-            "message": exc.detail,
-            "status_code": exc.status_code,
-            "path": str(request.url)
-        }
-    )
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """Handle HTTP exceptions (FastAPI's HTTPException subclasses Starlette's)."""
+    return _error_response(request, exc.status_code, exc.detail)
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle Pydantic validation errors."""
-    return JSONResponse(
-        status_code=422,
-        content={
-            "error": True,
-            "message": "Validation error",
-            "details": exc.errors(),
-            "status_code": 422,
-            "path": str(request.url)
-        }
-    )
+    return _error_response(request, 422, "Validation error", details=exc.errors())
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
-    logger.error(f"Unexpected error: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": True,
-            "message": "Internal server error",
-            "status_code": 500,
-            "path": str(request.url)
-        }
-    )
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event."""
-    logger.info("Starting WhatsApp Automation MVP...")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
-    logger.info(f"Database URL configured: {bool(settings.DATABASE_URL)}")
-    logger.info(f"WhatsApp token configured: {bool(settings.WHATSAPP_TOKEN)}")
-    
-    try:
-        # Create database tables
-        logger.info("Creating database tables...")
-        create_tables()
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Failed to create database tables: {str(e)}")
-        raise
-    
-    logger.info("WhatsApp Automation MVP started successfully")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown event."""
-    logger.info("Shutting down WhatsApp Automation MVP...")
-    logger.info("Shutdown completed")
+    logger.error("Unexpected error: %s", exc, exc_info=True)
+    return _error_response(request, 500, "Internal server error")
+
+
+# Root and health payloads only depend on settings, serialize them once
+_ROOT_BODY = orjson.dumps({
+    "message": "WhatsApp Automation MVP API",
+    "version": "1.0.0",
+    "status": "running",
+    "environment": settings.ENVIRONMENT,
+    "docs_url": "/docs",
+    "redoc_url": "/redoc"
+})
+_ROOT_ETAG = f'"{hashlib.sha1(_ROOT_BODY).hexdigest()}"'
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "environment": settings.ENVIRONMENT,
+    "debug": settings.DEBUG
+})
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint with API information."""
-    return {
-        "message": "WhatsApp Automation MVP API",
-        "version": "1.0.0",
-        "status": "running",
-        "environment": settings.ENVIRONMENT,
-        "docs_url": "/docs",
-        "redoc_url": "/redoc"
-    }
+    if request.headers.get("if-none-match") == _ROOT_ETAG:
+        return Response(status_code=304, headers={"ETag": _ROOT_ETAG})
+    return Response(
+        _ROOT_BODY,
+        media_type="application/json",
+        headers={"ETag": _ROOT_ETAG, "Cache-Control": "public, max-age=3600"}
+    )
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "environment": settings.ENVIRONMENT,
-        "debug": settings.DEBUG
-    }
-
-
-# Include API routers
-from app.api.messages import router as messages_router
-from app.api.webhooks import router as webhooks_router
-
-app.include_router(messages_router)
-app.include_router(webhooks_router)
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
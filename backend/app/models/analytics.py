@@ -1,7 +1,8 @@
 """
 Analytics model for tracking various metrics and performance data.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Float, Enum, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -22,14 +23,28 @@ class Analytics(Base):
     __tablename__ = "analytics"
     
     id = Column(Integer, primary_key=True, index=True)
-    metric_type = Column(Enum(MetricType), nullable=False, index=True)
-    metric_name = Column(String(100), nullable=False, index=True)
+    metric_type = Column(Enum(MetricType), nullable=False)
+    metric_name = Column(String(100), nullable=False)
     metric_value = Column(Float, nullable=False)
-    dimensions = Column(JSON, nullable=True)  # Flexible dimensions for filtering
+    dimensions = Column(JSONB, nullable=True)  # Flexible dimensions for filtering
     recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     period_start = Column(DateTime(timezone=True), nullable=True, index=True)  # For time-based metrics
     period_end = Column(DateTime(timezone=True), nullable=True, index=True)
     
+    __table_args__ = (
+        # Daily metric upsert (metric_name IN (...) within a day); also covers metric_name alone
+        Index("idx_analytics_name_recorded_at", metric_name, recorded_at),
+        # Latest metrics of a given type, index-only thanks to the included value
+        Index(
+            "idx_analytics_type_recorded_at",
+            metric_type,
+            recorded_at.desc(),
+            postgresql_include=["metric_value"]
+        ),
+        # Containment queries on dimensions (dimensions @> '{...}')
+        Index("idx_analytics_dimensions", dimensions, postgresql_using="gin"),
+    )
+    
     def __repr__(self):
         return f"<Analytics(id={self.id}, type='{self.metric_type}', name='{self.metric_name}')>"
     
@@ -1,7 +1,7 @@
 """
 Automation log model for tracking automation executions.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Enum as SAEnum, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Enum as SAEnum, Float, Index
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -21,7 +21,7 @@ class AutomationLog(Base):
     __tablename__ = "automation_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    automation_id = Column(Integer, ForeignKey("automations.id"), nullable=False, index=True)
+    automation_id = Column(Integer, ForeignKey("automations.id"), nullable=False)
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True, index=True)  # Null for bulk operations
     execution_status = Column(
         SAEnum(
@@ -38,6 +38,11 @@ class AutomationLog(Base):
     executed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     executed_by = Column(String(50), default="system", nullable=False)  # "system" or user identifier
     
+    __table_args__ = (
+        # Per-automation history, newest first; also covers automation_id alone (FK)
+        Index("idx_automation_logs_automation_executed_at", automation_id, executed_at.desc()),
+    )
+    
     def __repr__(self):
         return f"<AutomationLog(id={self.id}, automation_id={self.automation_id}, status='{self.execution_status}')>"
     
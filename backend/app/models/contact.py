@@ -1,7 +1,8 @@
 """
 Enhanced Contact model with all required metadata.
 """
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, ForeignKey, Index, extract
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -16,7 +17,7 @@ class Contact(Base):
     phone = Column(String(20), unique=True, index=True, nullable=False)
     email = Column(String(100), nullable=True, index=True)
     birthday = Column(Date, nullable=True, index=True)  # 9999-XX-XX for unknown year
-    tags = Column(JSON, nullable=True)  # Array of strings for flexible tagging
+    tags = Column(JSONB, nullable=True)  # Array of strings for flexible tagging
     notes = Column(Text, nullable=True)
     last_contacted = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
@@ -24,6 +25,18 @@ class Contact(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     
+    __table_args__ = (
+        # Serves the daily birthday scan (month/day match on active contacts)
+        Index(
+            "idx_contacts_birthday_month_day",
+            extract("month", birthday),
+            extract("day", birthday),
+            postgresql_where=(is_active == True)
+        ),
+        # Containment queries on tags (tags @> '["vip"]')
+        Index("idx_contacts_tags", tags, postgresql_using="gin"),
+    )
+    
     def __repr__(self):
         return f"<Contact(id={self.id}, name='{self.name}', phone='{self.phone}')>"
     
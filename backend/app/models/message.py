@@ -1,7 +1,8 @@
 """
 Message model with threading support and comprehensive metadata.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Enum as SAEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum as SAEnum, Index, and_
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -39,8 +40,8 @@ class Message(Base):
     __tablename__ = "messages"
     
     id = Column(Integer, primary_key=True, index=True)
-    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False, index=True)
-    conversation_id = Column(String(36), nullable=False, index=True)  # UUID for threading
+    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False)
+    conversation_id = Column(UUID(as_uuid=True), nullable=False)  # Native UUID for threading
     direction = Column(
         SAEnum(
             MessageDirection,
@@ -59,7 +60,7 @@ class Message(Base):
         nullable=False
     )
     content = Column(Text, nullable=False)
-    whatsapp_message_id = Column(String(100), nullable=True, index=True)  # WhatsApp API message ID
+    whatsapp_message_id = Column(String(100), nullable=True)  # WhatsApp API message ID
     status = Column(
         SAEnum(
             MessageStatus,
@@ -73,17 +74,42 @@ class Message(Base):
     delivered_at = Column(DateTime(timezone=True), nullable=True)
     read_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
-    extra_metadata = Column("metadata", JSON, nullable=True)  # Flexible metadata storage
+    extra_metadata = Column("metadata", JSONB, nullable=True)  # Flexible metadata storage
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # Null for inbound messages
     
+    __table_args__ = (
+        # One row per WhatsApp message; lets redelivered webhooks be deduplicated
+        Index("idx_messages_whatsapp_id", whatsapp_message_id, unique=True),
+        # Recent messages for a contact; also covers contact_id lookups on its own.
+        # INCLUDE lets status/direction breakdowns run as index-only scans
+        Index(
+            "idx_messages_contact_created_at",
+            contact_id,
+            created_at.desc(),
+            postgresql_include=["status", "direction"]
+        ),
+        # Conversation thread pages; also covers conversation_id lookups alone
+        Index("idx_messages_conversation_created_at", conversation_id, created_at.desc()),
+        # Message listing sort key, also used by keyset pagination
+        Index("idx_messages_created_at_id", created_at.desc(), id.desc()),
+        # Retry scan only ever looks at failed outbound messages
+        Index(
+            "idx_messages_failed_outbound",
+            id,
+            postgresql_where=and_(status == MessageStatus.FAILED, direction == MessageDirection.OUTBOUND)
+        ),
+        # Containment queries on metadata (metadata @> '{...}')
+        Index("idx_messages_metadata", extra_metadata, postgresql_using="gin"),
+    )
+    
     def __repr__(self):
         return f"<Message(id={self.id}, contact_id={self.contact_id}, direction='{self.direction}')>"
     
     @classmethod
-    def create_conversation_id(cls) -> str:
+    def create_conversation_id(cls) -> uuid.UUID:
         """Generate a new conversation UUID."""
-        return str(uuid.uuid4())
+        return uuid.uuid4()
     
     def update_status(self, status: MessageStatus, timestamp: DateTime = None):
         """Update message status with appropriate timestamp."""
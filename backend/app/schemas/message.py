@@ -1,12 +1,25 @@
 """
 Pydantic schemas for message-related API operations.
 """
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from typing import Optional, List, Dict, Any, Final
 from datetime import datetime
+from uuid import UUID
 from app.models.message import MessageDirection, MessageType, MessageStatus
 
 
+class PaginationParams(BaseModel):
+    """Shared page/size query parameters."""
+    page: int = Field(default=1, ge=1)
+    size: int = Field(default=20, ge=1, le=100)
+
+
+class PaginatedResponse(BaseModel):
+    """Shared page/size fields of list responses."""
+    page: int
+    size: int
+
+
 class MessageSendRequest(BaseModel):
     """Schema for sending a WhatsApp message."""
     contact_id: int = Field(..., description="ID of the contact to send message to")
@@ -28,7 +41,7 @@ class MessageRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
     contact_id: int
-    conversation_id: str
+    conversation_id: UUID
     direction: MessageDirection
     message_type: MessageType
     content: str
@@ -44,17 +57,20 @@ class MessageRead(BaseModel):
     
 
 
-class MessageListResponse(BaseModel):
+# Built once at import; validates a whole page of ORM rows in one call
+MESSAGE_LIST_ADAPTER: Final = TypeAdapter(List[MessageRead])
+
+
+class MessageListResponse(PaginatedResponse):
     """Schema for message list response."""
     messages: List[MessageRead]
-    total: int
-    page: int
-    size: int
+    total: Optional[int] = None  # Not computed for cursor-paginated requests
+    next_cursor: Optional[str] = None
 
 
 class ConversationResponse(BaseModel):
     """Schema for conversation response."""
-    conversation_id: str
+    conversation_id: UUID
     contact_id: int
     contact_name: str
     contact_phone: str
@@ -64,12 +80,10 @@ class ConversationResponse(BaseModel):
     unread_count: int
 
 
-class ConversationListResponse(BaseModel):
+class ConversationListResponse(PaginatedResponse):
     """Schema for conversation list response."""
     conversations: List[ConversationResponse]
     total: int
-    page: int
-    size: int
 
 
 class MessageStatusUpdate(BaseModel):
@@ -79,25 +93,6 @@ class MessageStatusUpdate(BaseModel):
     error_message: Optional[str] = None
 
 
-class WebhookMessageData(BaseModel):
-    """Schema for incoming webhook message data."""
-    message_id: str
-    from_number: str
-    content: str
-    message_type: str
-    timestamp: int
-    raw_data: Dict[str, Any]
-
-
-class WebhookStatusData(BaseModel):
-    """Schema for incoming webhook status data."""
-    message_id: str
-    status: str
-    timestamp: int
-    recipient_id: str
-    raw_data: Dict[str, Any]
-
-
 class TemplateMessageRequest(BaseModel):
     """Schema for sending a template message."""
     contact_id: int = Field(..., description="ID of the contact to send message to")
@@ -106,15 +101,14 @@ class TemplateMessageRequest(BaseModel):
     components: Optional[List[Dict[str, Any]]] = Field(default=None, description="Template components")
 
 
-class MessageSearchFilters(BaseModel):
+class MessageSearchFilters(PaginationParams):
     """Schema for message search filters."""
     contact_id: Optional[int] = None
-    conversation_id: Optional[str] = None
+    conversation_id: Optional[UUID] = None
     direction: Optional[MessageDirection] = None
     message_type: Optional[MessageType] = None
     status: Optional[MessageStatus] = None
     date_from: Optional[datetime] = None
     date_to: Optional[datetime] = None
     search: Optional[str] = None
-    page: int = Field(default=1, ge=1)
-    size: int = Field(default=20, ge=1, le=100)
+    cursor: Optional[str] = None  # Keyset cursor, takes precedence over page
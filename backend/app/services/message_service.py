@@ -1,12 +1,17 @@
 """
 Message service for managing WhatsApp messages and conversations.
 """
+import base64
 import logging
+import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from fastapi import Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import and_, or_, desc, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 
+from app.database import get_db
 from app.models.message import Message, MessageDirection, MessageType, MessageStatus
 from app.models.contact import Contact
 from app.schemas.message import (
@@ -19,6 +24,21 @@ from app.core.logging import get_logger, log_performance
 logger = get_logger(__name__)
 
 
+def _encode_cursor(message: Message) -> str:
+    """Encode a message's (created_at, id) sort key as an opaque cursor."""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    """Decode a cursor produced by _encode_cursor into (created_at, id)."""
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
 class MessageService:
     """Service for managing messages and conversations."""
     
@@ -37,44 +57,44 @@ class MessageService:
         Returns:
             Dict containing send result and message data
         """
-        logger.info(f"Processing message send request for contact {request.contact_id}")
-        logger.debug(f"Request details: {request}")
+        logger.info("Processing message send request for contact %s", request.contact_id)
+        logger.debug("Request details: %s", request)
         
         try:
             # Get contact information
-            logger.debug(f"Looking up contact {request.contact_id}")
-            contact = self.db.query(Contact).filter(Contact.id == request.contact_id).first()
+            logger.debug("Looking up contact %s", request.contact_id)
+            contact = self.db.get(Contact, request.contact_id)
             if not contact:
-                logger.error(f"Contact {request.contact_id} not found")
+                logger.error("Contact %s not found", request.contact_id)
                 return {"success": False, "error": "Contact not found"}
             
             if not contact.is_active:
-                logger.error(f"Contact {request.contact_id} is not active")
+                logger.error("Contact %s is not active", request.contact_id)
                 return {"success": False, "error": "Contact is not active"}
             
-            logger.info(f"Found contact: {contact.name} ({contact.phone})")
+            logger.info("Found contact: %s (%s)", contact.name, contact.phone)
             
             # Clean phone number (remove + and spaces)
             phone_number = contact.phone.replace("+", "").replace(" ", "")
-            logger.debug(f"Cleaned phone number: {phone_number}")
+            logger.debug("Cleaned phone number: %s", phone_number)
             
             # Send message via WhatsApp API
             if request.message_type == MessageType.TEXT:
-                logger.info(f"Sending text message via WhatsApp API")
+                logger.info("Sending text message via WhatsApp API")
                 result = await whatsapp_service.send_text_message(phone_number, request.content)
             else:
-                logger.error(f"Message type {request.message_type} not supported yet")
+                logger.error("Message type %s not supported yet", request.message_type)
                 return {"success": False, "error": f"Message type {request.message_type} not supported yet"}
             
             if not result["success"]:
-                logger.error(f"WhatsApp API call failed: {result['error']}")
+                logger.error("WhatsApp API call failed: %s", result['error'])
                 return result
             
-            logger.info(f"WhatsApp API call successful: {result['message_id']}")
+            logger.info("WhatsApp API call successful: %s", result['message_id'])
             
             # Create message record in database
             conversation_id = self._get_or_create_conversation_id(contact.id)
-            logger.debug(f"Using conversation ID: {conversation_id}")
+            logger.debug("Using conversation ID: %s", conversation_id)
             
             message = Message(
                 contact_id=request.contact_id,
@@ -84,7 +104,7 @@ class MessageService:
                 content=request.content,
                 whatsapp_message_id=result["message_id"],
                 status=MessageStatus.SENT,
-                sent_at=datetime.now(),
+                sent_at=func.now(),
                 extra_metadata=request.metadata,
                 created_by=user_id
             )
@@ -93,14 +113,14 @@ class MessageService:
             self.db.commit()
             self.db.refresh(message)
             
-            logger.info(f"Message record created in database: {message.id}")
+            logger.info("Message record created in database: %s", message.id)
             
             # Update contact's last_contacted timestamp
-            contact.last_contacted = datetime.now()
+            contact.last_contacted = func.now()
             self.db.commit()
             
-            logger.info(f"Message sent successfully: {message.id} to contact {contact.id}")
-            logger.debug(f"Message details: {message}")
+            logger.info("Message sent successfully: %s to contact %s", message.id, contact.id)
+            logger.debug("Message details: %s", message)
             
             return {
                 "success": True,
@@ -110,8 +130,7 @@ class MessageService:
             }
             
         except Exception as e:
-            logger.error(f"Error sending message: {str(e)}")
-            logger.exception("Full error traceback:")
+            logger.error("Error sending message: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             self.db.rollback()
             return {"success": False, "error": str(e)}
     
@@ -133,7 +152,7 @@ class MessageService:
         """
         try:
             # Get contact information
-            contact = self.db.query(Contact).filter(Contact.id == contact_id).first()
+            contact = self.db.get(Contact, contact_id)
             if not contact:
                 return {"success": False, "error": "Contact not found"}
             
@@ -160,7 +179,7 @@ class MessageService:
                 content=f"Template: {template_name}",
                 whatsapp_message_id=result["message_id"],
                 status=MessageStatus.SENT,
-                sent_at=datetime.now(),
+                sent_at=func.now(),
                 extra_metadata={
                     "template_name": template_name,
                     "language": language,
@@ -174,10 +193,10 @@ class MessageService:
             self.db.refresh(message)
             
             # Update contact's last_contacted timestamp
-            contact.last_contacted = datetime.now()
+            contact.last_contacted = func.now()
             self.db.commit()
             
-            logger.info(f"Template message sent successfully: {message.id} to contact {contact.id}")
+            logger.info("Template message sent successfully: %s to contact %s", message.id, contact.id)
             
             return {
                 "success": True,
@@ -187,10 +206,35 @@ class MessageService:
             }
             
         except Exception as e:
-            logger.error(f"Error sending template message: {str(e)}")
+            logger.error("Error sending template message: %s", e)
             self.db.rollback()
             return {"success": False, "error": str(e)}
     
+    def _fetch_page(self, query, page: int, size: int):
+        """
+        Fetch one page of a query together with the total row count.
+        
+        The total is computed by a count(*) OVER () window in the same
+        statement, so a page costs one round trip instead of COUNT + SELECT.
+        
+        Args:
+            query: Ordered query to paginate
+            page: Page number
+            size: Page size
+            
+        Returns:
+            Tuple of (rows, total); each row carries a trailing total_count column
+        """
+        rows = query.add_columns(func.count().over().label("total_count"))\
+                    .offset((page - 1) * size)\
+                    .limit(size)\
+                    .all()
+        if rows:
+            return rows, rows[0].total_count
+        
+        # An empty page has no window value; only pages past the end need a real count
+        return rows, query.order_by(None).count() if page > 1 else 0
+    
     def get_messages(self, filters: MessageSearchFilters) -> Dict[str, Any]:
         """
         Get messages with optional filtering and pagination.
@@ -230,25 +274,35 @@ class MessageService:
                 search_term = f"%{filters.search}%"
                 query = query.filter(Message.content.ilike(search_term))
             
-            # Get total count
-            total = query.count()
+            query = query.order_by(desc(Message.created_at), desc(Message.id))
             
-            # Apply pagination and ordering
-            messages = query.order_by(desc(Message.created_at))\
-                          .offset((filters.page - 1) * filters.size)\
-                          .limit(filters.size)\
-                          .all()
+            if filters.cursor:
+                # Keyset pagination: seek past the last row of the previous
+                # page instead of scanning and discarding OFFSET rows
+                query = query.filter(
+                    tuple_(Message.created_at, Message.id) < tuple_(*_decode_cursor(filters.cursor))
+                )
+                messages = query.limit(filters.size + 1).all()
+                total = None
+                has_more = len(messages) > filters.size
+                messages = messages[:filters.size]
+            else:
+                # Apply pagination (total comes back with the page)
+                rows, total = self._fetch_page(query, filters.page, filters.size)
+                messages = [row[0] for row in rows]
+                has_more = filters.page * filters.size < total
             
             return {
                 "success": True,
                 "messages": messages,
                 "total": total,
                 "page": filters.page,
-                "size": filters.size
+                "size": filters.size,
+                "next_cursor": _encode_cursor(messages[-1]) if has_more and messages else None
             }
             
         except Exception as e:
-            logger.error(f"Error getting messages: {str(e)}")
+            logger.error("Error getting messages: %s", e)
             return {"success": False, "error": str(e)}
     
     def get_conversations(self, page: int = 1, size: int = 20) -> Dict[str, Any]:
@@ -281,26 +335,27 @@ class MessageService:
              .group_by(Message.conversation_id, Message.contact_id, Contact.name, Contact.phone)\
              .order_by(desc('last_activity'))
             
-            # Get total count
-            total = conversations_query.count()
+            # Apply pagination (total comes back with the page)
+            conversations, total = self._fetch_page(conversations_query, page, size)
             
-            # Apply pagination
-            conversations = conversations_query.offset((page - 1) * size).limit(size).all()
+            # Get last message for every conversation on the page in one query
+            # (DISTINCT ON keeps the newest row per conversation_id)
+            last_messages = {
+                message.conversation_id: message
+                for message in self.db.query(Message)
+                    .filter(Message.conversation_id.in_([conv.conversation_id for conv in conversations]))
+                    .order_by(Message.conversation_id, desc(Message.created_at))
+                    .distinct(Message.conversation_id)
+            } if conversations else {}
             
-            # Get last message for each conversation
             conversation_list = []
             for conv in conversations:
-                last_message = self.db.query(Message)\
-                    .filter(Message.conversation_id == conv.conversation_id)\
-                    .order_by(desc(Message.created_at))\
-                    .first()
-                
                 conversation_list.append(ConversationResponse(
                     conversation_id=conv.conversation_id,
                     contact_id=conv.contact_id,
                     contact_name=conv.contact_name,
                     contact_phone=conv.contact_phone,
-                    last_message=last_message,
+                    last_message=last_messages.get(conv.conversation_id),
                     message_count=conv.message_count,
                     last_activity=conv.last_activity,
                     unread_count=conv.unread_count
@@ -315,10 +370,10 @@ class MessageService:
             }
             
         except Exception as e:
-            logger.error(f"Error getting conversations: {str(e)}")
+            logger.error("Error getting conversations: %s", e)
             return {"success": False, "error": str(e)}
     
-    def get_conversation_messages(self, conversation_id: str, page: int = 1, size: int = 50) -> Dict[str, Any]:
+    def get_conversation_messages(self, conversation_id: uuid.UUID, page: int = 1, size: int = 50) -> Dict[str, Any]:
         """
         Get messages for a specific conversation.
         
@@ -333,14 +388,9 @@ class MessageService:
         try:
             query = self.db.query(Message).filter(Message.conversation_id == conversation_id)
             
-            # Get total count
-            total = query.count()
-            
-            # Get messages with pagination
-            messages = query.order_by(Message.created_at)\
-                          .offset((page - 1) * size)\
-                          .limit(size)\
-                          .all()
+            # Get messages with pagination (total comes back with the page)
+            rows, total = self._fetch_page(query.order_by(Message.created_at), page, size)
+            messages = [row[0] for row in rows]
             
             return {
                 "success": True,
@@ -351,7 +401,7 @@ class MessageService:
             }
             
         except Exception as e:
-            logger.error(f"Error getting conversation messages: {str(e)}")
+            logger.error("Error getting conversation messages: %s", e)
             return {"success": False, "error": str(e)}
     
     async def process_incoming_message(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -365,23 +415,43 @@ class MessageService:
             Dict containing processing result
         """
         try:
+            # Meta retries webhooks it considers undelivered; skip messages already stored
+            existing_id = self.db.query(Message.id).filter(
+                Message.whatsapp_message_id == message_data['message_id']
+            ).scalar()
+            if existing_id is not None:
+                logger.info("Duplicate incoming message ignored: %s", message_data['message_id'])
+                return {
+                    "success": True,
+                    "duplicate": True,
+                    "message_id": existing_id
+                }
+            
             # Find or create contact
-            contact = self.db.query(Contact).filter(
-                Contact.phone == f"+{message_data['from_number']}"
-            ).first()
+            phone = f"+{message_data['from_number']}"
+            contact = self.db.query(Contact).filter(Contact.phone == phone).first()
             
             if not contact:
                 # Create new contact for incoming message
                 contact = Contact(
                     name=f"Contact {message_data['from_number']}",
-                    phone=f"+{message_data['from_number']}",
+                    phone=phone,
                     is_active=True,
                     created_by=1  # System user
                 )
                 self.db.add(contact)
-                self.db.commit()
-                self.db.refresh(contact)
-                logger.info(f"Created new contact for incoming message: {contact.id}")
+                try:
+                    self.db.commit()
+                    self.db.refresh(contact)
+                    logger.info("Created new contact for incoming message: %s", contact.id)
+                except IntegrityError:
+                    # A concurrent webhook may have created the contact first and
+                    # the unique phone constraint rejected ours; any other
+                    # integrity failure (e.g. a missing created_by user) re-raises
+                    self.db.rollback()
+                    contact = self.db.query(Contact).filter(Contact.phone == phone).first()
+                    if contact is None:
+                        raise
             
             # Create message record
             message = Message(
@@ -398,14 +468,29 @@ class MessageService:
             )
             
             self.db.add(message)
-            self.db.commit()
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # A concurrent delivery of the same webhook stored it first
+                self.db.rollback()
+                existing_id = self.db.query(Message.id).filter(
+                    Message.whatsapp_message_id == message_data['message_id']
+                ).scalar()
+                if existing_id is None:
+                    raise
+                logger.info("Duplicate incoming message ignored: %s", message_data['message_id'])
+                return {
+                    "success": True,
+                    "duplicate": True,
+                    "message_id": existing_id
+                }
             self.db.refresh(message)
             
             # Update contact's last_contacted timestamp
-            contact.last_contacted = datetime.now()
+            contact.last_contacted = func.now()
             self.db.commit()
             
-            logger.info(f"Incoming message processed: {message.id} from contact {contact.id}")
+            logger.info("Incoming message processed: %s from contact %s", message.id, contact.id)
             
             return {
                 "success": True,
@@ -415,10 +500,44 @@ class MessageService:
             }
             
         except Exception as e:
-            logger.error(f"Error processing incoming message: {str(e)}")
+            logger.error("Error processing incoming message: %s", e)
             self.db.rollback()
             return {"success": False, "error": str(e)}
     
+    def _apply_status_update(self, whatsapp_message_id: str, status: str, timestamp=None):
+        """
+        Execute a status update without committing.
+        
+        Args:
+            whatsapp_message_id: WhatsApp message ID
+            status: New status
+            timestamp: Status timestamp (unix seconds)
+            
+        Returns:
+            Row of (message_id, old_status), or None if no message matched
+        """
+        values = {"status": MessageStatus(status)}
+        if timestamp:
+            status_time = datetime.fromtimestamp(int(timestamp))
+            if status == "delivered":
+                values["delivered_at"] = status_time
+            elif status == "read":
+                values["read_at"] = status_time
+        
+        # Update by WhatsApp message ID and read back the previous status
+        # in a single UPDATE ... FROM ... RETURNING round trip
+        target = select(Message.id, Message.status)\
+            .where(Message.whatsapp_message_id == whatsapp_message_id)\
+            .limit(1)\
+            .subquery()
+        return self.db.execute(
+            update(Message)
+            .where(Message.id == target.c.id)
+            .values(**values)
+            .returning(Message.id, target.c.status),
+            execution_options={"synchronize_session": False}
+        ).first()
+    
     async def update_message_status(self, whatsapp_message_id: str, status: str, 
                                   timestamp: int = None) -> Dict[str, Any]:
         """
@@ -433,42 +552,67 @@ class MessageService:
             Dict containing update result
         """
         try:
-            # Find message by WhatsApp message ID
-            message = self.db.query(Message).filter(
-                Message.whatsapp_message_id == whatsapp_message_id
-            ).first()
-            
-            if not message:
+            row = self._apply_status_update(whatsapp_message_id, status, timestamp)
+            if not row:
                 return {"success": False, "error": "Message not found"}
             
-            # Update status
-            old_status = message.status
-            message.status = MessageStatus(status)
-            
-            if timestamp:
-                status_time = datetime.fromtimestamp(timestamp)
-                if status == "delivered":
-                    message.delivered_at = status_time
-                elif status == "read":
-                    message.read_at = status_time
-            
             self.db.commit()
+            message_id, old_status = row
             
-            logger.info(f"Message status updated: {message.id} from {old_status} to {status}")
+            logger.debug("Message status updated: %s from %s to %s", message_id, old_status, status)
             
             return {
                 "success": True,
-                "message_id": message.id,
+                "message_id": message_id,
                 "old_status": old_status,
                 "new_status": status
             }
             
         except Exception as e:
-            logger.error(f"Error updating message status: {str(e)}")
+            logger.error("Error updating message status: %s", e)
             self.db.rollback()
             return {"success": False, "error": str(e)}
     
-    def _get_or_create_conversation_id(self, contact_id: int) -> str:
+    def update_message_statuses(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply a batch of WhatsApp status updates in a single transaction.
+        
+        Blocking; async callers should run it in the threadpool.
+        
+        Args:
+            updates: Dicts with whatsapp_message_id, status and timestamp
+            
+        Returns:
+            Dict containing the number of updated messages and per-update errors
+        """
+        updated = 0
+        errors = []
+        try:
+            for item in updates:
+                try:
+                    row = self._apply_status_update(
+                        item["whatsapp_message_id"], item["status"], item.get("timestamp")
+                    )
+                except ValueError as e:
+                    errors.append(f"Invalid status update {item['whatsapp_message_id']}: {e}")
+                    continue
+                
+                if row:
+                    updated += 1
+                else:
+                    errors.append(f"Message not found: {item['whatsapp_message_id']}")
+            
+            self.db.commit()
+            logger.info("Message statuses updated: %s of %s", updated, len(updates))
+            
+            return {"success": True, "updated": updated, "errors": errors}
+            
+        except Exception as e:
+            logger.error("Error updating message statuses: %s", e)
+            self.db.rollback()
+            return {"success": False, "updated": 0, "errors": [str(e)]}
+    
+    def _get_or_create_conversation_id(self, contact_id: int) -> uuid.UUID:
         """
         Get or create conversation ID for a contact.
         
@@ -487,5 +631,14 @@ class MessageService:
             return existing_message.conversation_id
         
         # Create new conversation ID
-        import uuid
-        return str(uuid.uuid4())
+        return Message.create_conversation_id()
+
+
+async def get_message_service(db: Session = Depends(get_db)) -> MessageService:
+    """
+    Dependency to get a message service bound to the request's session.
+    
+    Declared async because construction does no I/O; this keeps FastAPI
+    from dispatching it to the threadpool on every request.
+    """
+    return MessageService(db)
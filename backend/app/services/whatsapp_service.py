@@ -1,8 +1,11 @@
 """
 WhatsApp Cloud API service for sending and receiving messages.
 """
+import asyncio
 import httpx
 import logging
+import orjson
+import weakref
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from app.core.config import settings
@@ -20,19 +23,78 @@ class WhatsAppService:
         self.access_token = settings.WHATSAPP_TOKEN
         self.business_id = settings.BUSINESS_ID
         self.verify_token = settings.WEBHOOK_VERIFY_TOKEN
+        # Fail fast on a stalled Graph API call instead of tying up a webhook or worker slot
+        self.timeout = httpx.Timeout(10.0, connect=5.0)
+        
+        # Request paths and headers are fixed per service, build them once
+        self._messages_path = f"/{self.phone_number_id}/messages"
+        self._auth_headers = {
+            "Authorization": f"Bearer {self.access_token}"
+        }
+        self._json_headers = {
+            **self._auth_headers,
+            "Content-Type": "application/json"
+        }
+        
+        # One pooled client per event loop, created lazily (see _get_client).
+        # Weak keys drop a client with its loop, so a new loop never reuses it
+        self._clients = weakref.WeakKeyDictionary()
         
         logger.info("Initializing WhatsApp Service")
-        logger.info(f"Base URL: {self.base_url}")
-        logger.info(f"Phone Number ID: {self.phone_number_id}")
-        logger.info(f"Business ID: {self.business_id}")
-        logger.info(f"Access Token configured: {bool(self.access_token)}")
-        logger.info(f"Verify Token configured: {bool(self.verify_token)}")
+        logger.info("Base URL: %s", self.base_url)
+        logger.info("Phone Number ID: %s", self.phone_number_id)
+        logger.info("Business ID: %s", self.business_id)
+        logger.info("Access Token configured: %s", bool(self.access_token))
+        logger.info("Verify Token configured: %s", bool(self.verify_token))
         
         if not all([self.phone_number_id, self.access_token, self.business_id]):
             logger.warning("WhatsApp configuration incomplete. Some features may not work.")
         else:
             logger.info("WhatsApp Service configuration complete")
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the pooled HTTP client for the running event loop.
+        
+        The client keeps connections to the Graph API alive between calls, so
+        only the first request pays the TCP+TLS handshake, and HTTP/2 lets
+        concurrent sends share that connection. httpx clients are bound to
+        the loop they were first used on, hence one client per loop.
+        
+        Returns:
+            Shared httpx.AsyncClient instance
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            logger.debug("Creating pooled HTTP client for event loop %s", id(loop))
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+            self._clients[loop] = client
+        return client
+    
+    async def aclose(self):
+        """Close the pooled HTTP client bound to the running event loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+            logger.info("WhatsApp HTTP client closed")
+    
+    def _log_error(self, action: str, response: httpx.Response):
+        """
+        Log a failed Graph API response.
+        
+        Args:
+            action: Description of the failed operation
+            response: Error response returned by the API
+        """
+        logger.error("HTTP error %s: %s", action, response.status_code)
+        logger.error("Response text: %s", response.text)
+    
     @log_performance()
     async def send_text_message(self, to: str, message: str) -> Dict[str, Any]:
         """
@@ -45,15 +107,12 @@ class WhatsAppService:
         Returns:
             Dict containing API response and message ID
         """
-        logger.info(f"Sending text message to {to}")
-        logger.debug(f"Message content: {message[:100]}{'...' if len(message) > 100 else ''}")
+        logger.info("Sending text message to %s", to)
+        logger.debug("Message content: %.100s", message)
         
         try:
-            url = f"{self.base_url}/{self.phone_number_id}/messages"
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json"
-            }
+            url = self._messages_path
+            headers = self._json_headers
             
             payload = {
                 "messaging_product": "whatsapp",
@@ -64,34 +123,34 @@ class WhatsAppService:
                 }
             }
             
-            logger.debug(f"API URL: {url}")
-            logger.debug(f"Payload: {payload}")
+            logger.debug("API URL: %s", url)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Payload: %s", orjson.dumps(payload).decode())
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                message_id = result.get('messages', [{}])[0].get('id')
-                logger.info(f"Message sent successfully to {to}: {message_id}")
-                logger.debug(f"Full API response: {result}")
-                
+            client = self._get_client()
+            response = await client.post(url, content=orjson.dumps(payload), headers=headers)
+            if response.is_error:
+                self._log_error(f"sending message to {to}", response)
                 return {
-                    "success": True,
-                    "message_id": message_id,
-                    "response": result
+                    "success": False,
+                    "error": f"HTTP {response.status_code}: {response.text}",
+                    "message_id": None
                 }
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error sending message to {to}: {e.response.status_code}")
-            logger.error(f"Response text: {e.response.text}")
+            
+            result = orjson.loads(response.content)
+            message_id = result.get('messages', [{}])[0].get('id')
+            logger.info("Message sent successfully to %s: %s", to, message_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Full API response: %s", orjson.dumps(result).decode())
+            
             return {
-                "success": False,
-                "error": f"HTTP {e.response.status_code}: {e.response.text}",
-                "message_id": None
+                "success": True,
+                "message_id": message_id,
+                "response": result
             }
+                
         except Exception as e:
-            logger.error(f"Error sending message to {to}: {str(e)}")
+            logger.error("Error sending message to %s: %s", to, e)
             return {
                 "success": False,
                 "error": str(e),
@@ -113,11 +172,8 @@ class WhatsAppService:
             Dict containing API response and message ID
         """
         try:
-            url = f"{self.base_url}/{self.phone_number_id}/messages"
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json"
-            }
+            url = self._messages_path
+            headers = self._json_headers
             
             payload = {
                 "messaging_product": "whatsapp",
@@ -132,31 +188,29 @@ class WhatsAppService:
                 }
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Template message sent successfully to {to}: {result.get('messages', [{}])[0].get('id')}")
-                logger.debug(f"Full API response: {result}")
-                
+            client = self._get_client()
+            response = await client.post(url, content=orjson.dumps(payload), headers=headers)
+            if response.is_error:
+                self._log_error(f"sending template to {to}", response)
                 return {
-                    "success": True,
-                    "message_id": result.get("messages", [{}])[0].get("id"),
-                    "response": result
+                    "success": False,
+                    "error": f"HTTP {response.status_code}: {response.text}",
+                    "message_id": None
                 }
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error sending template to {to}: {e.response.status_code} - {e.response.text}")
-            logger.error(f"Response text: {e.response.text}")
+            
+            result = orjson.loads(response.content)
+            logger.info("Template message sent successfully to %s: %s", to, result.get('messages', [{}])[0].get('id'))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Full API response: %s", orjson.dumps(result).decode())
+            
             return {
-                "success": False,
-                "error": f"HTTP {e.response.status_code}: {e.response.text}",
-                "message_id": None
+                "success": True,
+                "message_id": result.get("messages", [{}])[0].get("id"),
+                "response": result
             }
+                
         except Exception as e:
-            logger.error(f"Error sending template to {to}: {str(e)}")
-            logger.error(f"Response text: {e.response.text}")
+            logger.error("Error sending template to %s: %s", to, e)
             return {
                 "success": False,
                 "error": str(e),
@@ -174,33 +228,28 @@ class WhatsAppService:
             Dict containing message status information
         """
         try:
-            url = f"{self.base_url}/{message_id}"
-            headers = {
-                "Authorization": f"Bearer {self.access_token}"
-            }
+            url = "/" + message_id
+            headers = self._auth_headers
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                
-                result = response.json()
+            client = self._get_client()
+            response = await client.get(url, headers=headers)
+            if response.is_error:
+                self._log_error(f"getting message status {message_id}", response)
                 return {
-                    "success": True,
-                    "status": result.get("status"),
-                    "response": result
+                    "success": False,
+                    "error": f"HTTP {response.status_code}: {response.text}",
+                    "status": None
                 }
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error getting message status {message_id}: {e.response.status_code}")
-            logger.error(f"Response text: {e.response.text}")
+            
+            result = orjson.loads(response.content)
             return {
-                "success": False,
-                "error": f"HTTP {e.response.status_code}: {e.response.text}",
-                "status": None
+                "success": True,
+                "status": result.get("status"),
+                "response": result
             }
+                
         except Exception as e:
-            logger.error(f"Error getting message status {message_id}: {str(e)}")
-            logger.error(f"Response text: {e.response.text}")
+            logger.error("Error getting message status %s: %s", message_id, e)
             return {
                 "success": False,
                 "error": str(e),
@@ -223,7 +272,7 @@ class WhatsAppService:
             logger.info("Webhook verification successful")
             return challenge
         else:
-            logger.warning(f"Webhook verification failed: mode={mode}, token={token}")
+            logger.warning("Webhook verification failed: mode=%s", mode)
             return None
     
     async def process_incoming_message(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -275,51 +324,7 @@ class WhatsAppService:
             }
             
         except Exception as e:
-            logger.error(f"Error processing incoming message: {str(e)}")
-            logger.error(f"Response text: {e.response.text}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-    
-    async def process_status_update(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Process status update webhook data from WhatsApp.
-        
-        Args:
-            webhook_data: Raw webhook data from Meta
-            
-        Returns:
-            Dict containing processed status information
-        """
-        try:
-            # Extract status data from webhook
-            entry = webhook_data.get("entry", [{}])[0]
-            changes = entry.get("changes", [{}])[0]
-            value = changes.get("value", {})
-            statuses = value.get("statuses", [])
-            
-            if not statuses:
-                return {"success": False, "error": "No statuses in webhook data"}
-            
-            status = statuses[0]
-            message_id = status.get("id")
-            status_type = status.get("status")
-            timestamp = status.get("timestamp")
-            recipient_id = status.get("recipient_id")
-            
-            return {
-                "success": True,
-                "message_id": message_id,
-                "status": status_type,
-                "timestamp": timestamp,
-                "recipient_id": recipient_id,
-                "raw_data": status
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing status update: {str(e)}")
-            logger.error(f"Response text: {e.response.text}")
+            logger.error("Error processing incoming message: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -5,17 +5,18 @@ from celery import current_task
 from app.core.celery import celery_app
 from app.database import SessionLocal
 from app.models.analytics import Analytics, MetricType
-from app.models.automation_log import AutomationLog
+from app.models.automation_log import AutomationLog, ExecutionStatus
 from app.models.contact import Contact
 from app.models.message import Message
 from app.models.automation import Automation
 from datetime import datetime, timedelta
+from sqlalchemy import func
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, ignore_result=True)
 def update_system_analytics(self):
     """
     Update system-wide analytics metrics.
@@ -38,27 +39,32 @@ def update_system_analytics(self):
             ("total_messages", total_messages, MetricType.SYSTEM_PERFORMANCE),
         ]
         
-        for metric_name, metric_value, metric_type in metrics_to_update:
-            # Check if metric already exists for today
-            today = datetime.now().date()
-            existing_metric = db.query(Analytics).filter(
-                Analytics.metric_name == metric_name,
+        # Fetch every metric already recorded today in one query
+        today = datetime.now().date()
+        existing_metrics = {
+            metric.metric_name: metric
+            for metric in db.query(Analytics).filter(
+                Analytics.metric_name.in_([name for name, _, _ in metrics_to_update]),
                 Analytics.recorded_at >= today,
                 Analytics.recorded_at < today + timedelta(days=1)
-            ).first()
-            
+            )
+        }
+        
+        new_metrics = []
+        for metric_name, metric_value, metric_type in metrics_to_update:
+            existing_metric = existing_metrics.get(metric_name)
             if existing_metric:
                 # Update existing metric
                 existing_metric.metric_value = metric_value
             else:
                 # Create new metric
-                new_metric = Analytics(
+                new_metrics.append(Analytics(
                     metric_type=metric_type,
                     metric_name=metric_name,
                     metric_value=metric_value,
                     dimensions={"period": "daily"}
-                )
-                db.add(new_metric)
+                ))
+        db.add_all(new_metrics)
         
         db.commit()
         
@@ -69,14 +75,14 @@ def update_system_analytics(self):
         }
         
     except Exception as e:
-        logger.error(f"Error updating system analytics: {str(e)}")
+        logger.error("Error updating system analytics: %s", e)
         db.rollback()
         return {"status": "failed", "error": str(e)}
     finally:
         db.close()
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, ignore_result=True)
 def cleanup_old_logs(self, days_to_keep: int = 30):
     """
     Clean up old automation logs and analytics data.
@@ -116,7 +122,7 @@ def cleanup_old_logs(self, days_to_keep: int = 30):
         }
         
     except Exception as e:
-        logger.error(f"Error cleaning up old logs: {str(e)}")
+        logger.error("Error cleaning up old logs: %s", e)
         db.rollback()
         return {"status": "failed", "error": str(e)}
     finally:
@@ -130,22 +136,21 @@ def calculate_automation_performance(self, automation_id: int):
     """
     db = SessionLocal()
     try:
-        automation = db.query(Automation).filter(Automation.id == automation_id).first()
+        automation = db.get(Automation, automation_id)
         if not automation:
             return {"status": "failed", "error": "Automation not found"}
         
-        # Get logs from last 30 days
+        # Aggregate logs from last 30 days in the database
         thirty_days_ago = datetime.now() - timedelta(days=30)
-        logs = db.query(AutomationLog).filter(
+        total_executions, successful_executions, failed_executions, total_contacts_affected = db.query(
+            func.count(),
+            func.count().filter(AutomationLog.execution_status == ExecutionStatus.SUCCESS),
+            func.count().filter(AutomationLog.execution_status == ExecutionStatus.FAILED),
+            func.coalesce(func.sum(AutomationLog.contacts_affected), 0)
+        ).filter(
             AutomationLog.automation_id == automation_id,
             AutomationLog.executed_at >= thirty_days_ago
-        ).all()
-        
-        # Calculate metrics
-        total_executions = len(logs)
-        successful_executions = len([log for log in logs if log.execution_status == "success"])
-        failed_executions = len([log for log in logs if log.execution_status == "failed"])
-        total_contacts_affected = sum(log.contacts_affected for log in logs)
+        ).one()
         
         success_rate = (successful_executions / total_executions * 100) if total_executions > 0 else 0
         
@@ -172,7 +177,7 @@ def calculate_automation_performance(self, automation_id: int):
         }
         
     except Exception as e:
-        logger.error(f"Error calculating automation performance: {str(e)}")
+        logger.error("Error calculating automation performance: %s", e)
         db.rollback()
         return {"status": "failed", "error": str(e)}
     finally:
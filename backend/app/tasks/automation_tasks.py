@@ -8,12 +8,13 @@ from app.models.automation import Automation
 from app.models.contact import Contact
 from app.models.automation_log import AutomationLog, ExecutionStatus
 from datetime import datetime, date
+from sqlalchemy import and_, extract, func
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, ignore_result=True)
 def check_birthday_automations(self):
     """
     Check for contacts with birthdays today and trigger birthday automations.
@@ -22,45 +23,43 @@ def check_birthday_automations(self):
     try:
         today = date.today()
         
-        # Find contacts with birthdays today
-        contacts_with_birthday = db.query(Contact).filter(
+        # Active contacts whose birthday is today (month/day match covers
+        # the 9999 placeholder year used for unknown birthdays)
+        is_birthday_today = and_(
             Contact.is_active == True,
-            Contact.birthday.isnot(None)
-        ).all()
+            Contact.birthday.isnot(None),
+            extract("month", Contact.birthday) == today.month,
+            extract("day", Contact.birthday) == today.day
+        )
         
-        birthday_contacts = []
-        for contact in contacts_with_birthday:
-            # Handle both known and unknown year birthdays
-            if contact.birthday.year == 9999:
-                # Unknown year - check if month and day match
-                if contact.birthday.month == today.month and contact.birthday.day == today.day:
-                    birthday_contacts.append(contact)
-            else:
-                # Known year - check exact date
-                if contact.birthday.month == today.month and contact.birthday.day == today.day:
-                    birthday_contacts.append(contact)
+        # Counted separately so the total still reflects today's birthdays
+        # when no automation matches
+        total_contacts = db.query(func.count(Contact.id)).filter(is_birthday_today).scalar()
         
-        # Find birthday automations
-        birthday_automations = db.query(Automation).filter(
+        # Pair every active birthday automation with every birthday contact
+        # in one query
+        work_items = db.query(Automation, Contact).join(
+            Contact,
+            is_birthday_today
+        ).filter(
             Automation.trigger_type == "birthday",
             Automation.is_active == True
-        ).order_by(Automation.priority.desc()).all()
+        ).order_by(Automation.priority.desc(), Automation.id).all()
         
         total_executed = 0
         total_failed = 0
         
-        for automation in birthday_automations:
-            for contact in birthday_contacts:
-                try:
-                    # Execute birthday automation for this contact
-                    result = execute_automation_for_contact(automation, contact, db)
-                    if result:
-                        total_executed += 1
-                    else:
-                        total_failed += 1
-                except Exception as e:
-                    logger.error(f"Error executing birthday automation {automation.id} for contact {contact.id}: {e}")
+        for automation, contact in work_items:
+            try:
+                # Execute birthday automation for this contact
+                result = execute_automation_for_contact(automation, contact, db)
+                if result:
+                    total_executed += 1
+                else:
                     total_failed += 1
+            except Exception as e:
+                logger.error("Error executing birthday automation %s for contact %s: %s", automation.id, contact.id, e)
+                total_failed += 1
         
         # Log execution
         log_automation_execution(
@@ -69,7 +68,7 @@ def check_birthday_automations(self):
             status=ExecutionStatus.SUCCESS if total_failed == 0 else ExecutionStatus.PARTIAL,
             contacts_affected=total_executed,
             execution_details={
-                "total_contacts": len(birthday_contacts),
+                "total_contacts": total_contacts,
                 "total_executed": total_executed,
                 "total_failed": total_failed
             },
@@ -78,13 +77,13 @@ def check_birthday_automations(self):
         
         return {
             "status": "completed",
-            "contacts_processed": len(birthday_contacts),
+            "contacts_processed": total_contacts,
             "automations_executed": total_executed,
             "failures": total_failed
         }
         
     except Exception as e:
-        logger.error(f"Error in birthday automation check: {str(e)}")
+        logger.error("Error in birthday automation check: %s", e)
         return {"status": "failed", "error": str(e)}
     finally:
         db.close()
@@ -97,9 +96,13 @@ def execute_automation_for_contact(self, automation_id: int, contact_id: int):
     """
     db = SessionLocal()
     try:
-        automation = db.query(Automation).filter(Automation.id == automation_id).first()
-        contact = db.query(Contact).filter(Contact.id == contact_id).first()
-        
+        # Fetch both rows in a single round-trip
+        row = db.query(Automation, Contact)\
+            .join(Contact, Contact.id == contact_id)\
+            .filter(Automation.id == automation_id)\
+            .one_or_none()
+        automation, contact = row if row else (None, None)
+
         if not automation or not contact:
             return {"status": "failed", "error": "Automation or contact not found"}
         
@@ -111,7 +114,7 @@ def execute_automation_for_contact(self, automation_id: int, contact_id: int):
         return {"status": "completed", "result": result}
         
     except Exception as e:
-        logger.error(f"Error executing automation {automation_id} for contact {contact_id}: {str(e)}")
+        logger.error("Error executing automation %s for contact %s: %s", automation_id, contact_id, e)
         return {"status": "failed", "error": str(e)}
     finally:
         db.close()
@@ -131,18 +134,18 @@ def execute_automation_for_contact(automation: Automation, contact: Contact, db)
         
         if action_type == "send_message":
             # TODO: Implement WhatsApp message sending
-            logger.info(f"Would send message to {contact.name} with payload: {action_payload}")
+            logger.info("Would send message to %s with payload: %s", contact.name, action_payload)
             return True
         elif action_type == "update_contact":
             # TODO: Implement contact updates
-            logger.info(f"Would update contact {contact.name} with payload: {action_payload}")
+            logger.info("Would update contact %s with payload: %s", contact.name, action_payload)
             return True
         else:
-            logger.warning(f"Unknown action type: {action_type}")
+            logger.warning("Unknown action type: %s", action_type)
             return False
             
     except Exception as e:
-        logger.error(f"Error executing automation: {str(e)}")
+        logger.error("Error executing automation: %s", e)
         return False
 
 
@@ -163,5 +166,5 @@ def log_automation_execution(automation_id: int, contact_id: int, status: Execut
         db.add(log_entry)
         db.commit()
     except Exception as e:
-        logger.error(f"Error logging automation execution: {str(e)}")
+        logger.error("Error logging automation execution: %s", e)
         db.rollback()
@@ -1,6 +1,7 @@
 """
 Message processing background tasks.
 """
+import logging
 from celery import current_task
 from app.core.celery import celery_app
 from app.database import SessionLocal
@@ -10,20 +11,20 @@ from app.core.logging import get_logger, log_performance
 logger = get_logger(__name__)
 
 
-@celery_app.task(bind=True)
-@log_performance()
+@celery_app.task(bind=True, ignore_result=True)
+@log_performance(sample_rate=0.01, slow_threshold_ms=500)
 def process_message_status_update(self, whatsapp_message_id: str, status: str, timestamp: int = None):
     """
     Update message status from WhatsApp webhook data.
     """
-    logger.info(f"Processing message status update: {whatsapp_message_id} -> {status}")
-    logger.debug(f"Timestamp: {timestamp}")
+    logger.debug("Processing message status update: %s -> %s", whatsapp_message_id, status)
+    logger.debug("Timestamp: %s", timestamp)
     
     db = SessionLocal()
     try:
         message = db.query(Message).filter(Message.whatsapp_message_id == whatsapp_message_id).first()
         if not message:
-            logger.error(f"Message not found: {whatsapp_message_id}")
+            logger.error("Message not found: %s", whatsapp_message_id)
             return {"status": "failed", "error": "Message not found"}
         
         # Update message status
@@ -31,19 +32,18 @@ def process_message_status_update(self, whatsapp_message_id: str, status: str, t
         message.update_status(MessageStatus(status), timestamp)
         db.commit()
         
-        logger.info(f"Updated message {message.id} status from {old_status} to {status}")
+        logger.info("Updated message %s status from %s to %s", message.id, old_status, status)
         return {"status": "completed", "message_id": message.id, "old_status": old_status, "new_status": status}
         
     except Exception as e:
-        logger.error(f"Error updating message status: {str(e)}")
-        logger.exception("Full error traceback:")
+        logger.error("Error updating message status: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
         db.rollback()
         return {"status": "failed", "error": str(e)}
     finally:
         db.close()
 
 
-@celery_app.task(bind=True)
+@celery_app.task(bind=True, ignore_result=True)
 def retry_failed_messages(self):
     """
     Retry failed message deliveries.
@@ -61,10 +61,10 @@ def retry_failed_messages(self):
             try:
                 # TODO: Implement actual message retry logic
                 # This will be expanded in Phase 2 when we implement WhatsApp integration
-                logger.info(f"Retrying message {message.id} to {message.contact_id}")
+                logger.info("Retrying message %s to %s", message.id, message.contact_id)
                 retry_count += 1
             except Exception as e:
-                logger.error(f"Error retrying message {message.id}: {str(e)}")
+                logger.error("Error retrying message %s: %s", message.id, e)
         
         return {
             "status": "completed",
@@ -73,7 +73,7 @@ def retry_failed_messages(self):
         }
         
     except Exception as e:
-        logger.error(f"Error in retry failed messages: {str(e)}")
+        logger.error("Error in retry failed messages: %s", e)
         return {"status": "failed", "error": str(e)}
     finally:
         db.close()
@@ -40,9 +40,9 @@ CREATE TABLE contacts (
 );
 
 -- Create indexes for contacts
-CREATE INDEX idx_contacts_phone ON contacts(phone);
 CREATE INDEX idx_contacts_email ON contacts(email);
 CREATE INDEX idx_contacts_birthday ON contacts(birthday);
+CREATE INDEX idx_contacts_birthday_month_day ON contacts ((EXTRACT(MONTH FROM birthday)), (EXTRACT(DAY FROM birthday))) WHERE is_active;
 CREATE INDEX idx_contacts_created_by ON contacts(created_by);
 CREATE INDEX idx_contacts_is_active ON contacts(is_active);
 CREATE INDEX idx_contacts_tags ON contacts USING GIN(tags);
@@ -51,7 +51,7 @@ CREATE INDEX idx_contacts_tags ON contacts USING GIN(tags);
 CREATE TABLE messages (
     id SERIAL PRIMARY KEY,
     contact_id INTEGER NOT NULL REFERENCES contacts(id),
-    conversation_id VARCHAR(36) NOT NULL,
+    conversation_id UUID NOT NULL,
     direction VARCHAR(10) NOT NULL CHECK (direction IN ('inbound', 'outbound')),
     message_type VARCHAR(20) NOT NULL DEFAULT 'text' CHECK (message_type IN ('text', 'image', 'document', 'audio', 'video', 'template')),
     content TEXT NOT NULL,
@@ -67,13 +67,15 @@ CREATE TABLE messages (
 );
 
 -- Create indexes for messages
-CREATE INDEX idx_messages_contact_id ON messages(contact_id);
-CREATE INDEX idx_messages_conversation_id ON messages(conversation_id);
 CREATE INDEX idx_messages_direction ON messages(direction);
 CREATE INDEX idx_messages_status ON messages(status);
 CREATE INDEX idx_messages_created_at ON messages(created_at);
-CREATE INDEX idx_messages_whatsapp_id ON messages(whatsapp_message_id);
+CREATE UNIQUE INDEX idx_messages_whatsapp_id ON messages(whatsapp_message_id);
 CREATE INDEX idx_messages_metadata ON messages USING GIN(metadata);
+CREATE INDEX idx_messages_conversation_created_at ON messages(conversation_id, created_at DESC);
+CREATE INDEX idx_messages_created_at_id ON messages(created_at DESC, id DESC);
+CREATE INDEX idx_messages_contact_created_at ON messages(contact_id, created_at DESC) INCLUDE (status, direction);
+CREATE INDEX idx_messages_failed_outbound ON messages(id) WHERE status = 'failed' AND direction = 'outbound';
 
 -- Automations table with flexible configuration
 CREATE TABLE automations (
@@ -116,11 +118,11 @@ CREATE TABLE automation_logs (
 );
 
 -- Create indexes for automation logs
-CREATE INDEX idx_automation_logs_automation_id ON automation_logs(automation_id);
 CREATE INDEX idx_automation_logs_contact_id ON automation_logs(contact_id);
 CREATE INDEX idx_automation_logs_status ON automation_logs(execution_status);
 CREATE INDEX idx_automation_logs_executed_at ON automation_logs(executed_at);
 CREATE INDEX idx_automation_logs_execution_details ON automation_logs USING GIN(execution_details);
+CREATE INDEX idx_automation_logs_automation_executed_at ON automation_logs(automation_id, executed_at DESC);
 
 -- Analytics table for comprehensive metrics
 CREATE TABLE analytics (
@@ -135,11 +137,11 @@ CREATE TABLE analytics (
 );
 
 -- Create indexes for analytics
-CREATE INDEX idx_analytics_metric_type ON analytics(metric_type);
-CREATE INDEX idx_analytics_metric_name ON analytics(metric_name);
 CREATE INDEX idx_analytics_recorded_at ON analytics(recorded_at);
 CREATE INDEX idx_analytics_period_start ON analytics(period_start);
 CREATE INDEX idx_analytics_dimensions ON analytics USING GIN(dimensions);
+CREATE INDEX idx_analytics_name_recorded_at ON analytics(metric_name, recorded_at);
+CREATE INDEX idx_analytics_type_recorded_at ON analytics(metric_type, recorded_at DESC) INCLUDE (metric_value);
 
 -- Create triggers for updated_at timestamps
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -0,0 +1,13 @@
+-- Schema update v2: store messages.conversation_id as a native UUID
+-- Apply to databases created before this change:
+--   psql -d automatizaciones -f schema_update_v2.sql
+-- Safe to re-run; the cast is a no-op once the column is already UUID.
+
+BEGIN;
+
+-- Existing values were written as str(uuid.uuid4()), so they cast directly.
+-- Indexes on the column (idx_messages_conversation_created_at) are rebuilt.
+ALTER TABLE messages
+    ALTER COLUMN conversation_id TYPE UUID USING conversation_id::uuid;
+
+COMMIT;
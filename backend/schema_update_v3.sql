@@ -0,0 +1,24 @@
+-- Schema update v3: make messages.whatsapp_message_id unique
+-- Apply to databases created before this change:
+--   psql -d automatizaciones -f schema_update_v3.sql
+-- Run with psql's default autocommit: CREATE/DROP INDEX CONCURRENTLY cannot
+-- run inside a transaction block. Safe to re-run.
+
+-- Webhook retries used to store a second copy of the same inbound message;
+-- keep the first row stored for each WhatsApp message ID
+DELETE FROM messages m
+USING messages keep
+WHERE m.whatsapp_message_id = keep.whatsapp_message_id
+  AND m.id > keep.id;
+
+-- Build the unique index under a temporary name so lookups keep an index
+-- throughout. If this fails because duplicates arrived meanwhile, drop the
+-- INVALID index it leaves behind and run the file again.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_whatsapp_id_unique
+    ON messages(whatsapp_message_id);
+
+-- Replace the old non-unique index (database_schema.sql and create_tables()
+-- named it differently)
+DROP INDEX CONCURRENTLY IF EXISTS idx_messages_whatsapp_id;
+DROP INDEX CONCURRENTLY IF EXISTS ix_messages_whatsapp_message_id;
+ALTER INDEX idx_messages_whatsapp_id_unique RENAME TO idx_messages_whatsapp_id;